@@ -1,36 +1,57 @@
 import os
+import re
 import json
+import asyncio
+import hashlib
 import joblib
 import numpy as np
-import requests
-from bs4 import BeautifulSoup
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import Ridge
+import httpx
+from selectolax.parser import HTMLParser
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDRegressor
 from sklearn.pipeline import make_pipeline
 from datetime import datetime, timedelta
-from newspaper import Article, Config
+import trafilatura
 from telegraph import Telegraph
 from fake_useragent import UserAgent
 from newsapi import NewsApiClient
-import nltk
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('punkt_tab') # For newer NLTK versions
 
 MODEL_FILE = 'data/model.pkl'
 NEWS_FILE = 'data/news.json'
 PORTALS_FILE = 'data/portals.json'
 NEWSAPI_CONFIG_FILE = 'data/newsapi_config.json'
 TELEGRAPH_TOKEN_FILE = 'data/telegraph_token.json'
+HTTP_CACHE_FILE = 'data/http_cache.json'
+
+MAX_ARTICLE_BYTES = 2 * 1024 * 1024  # Bail out of pages bigger than this
+MAX_CONCURRENCY = 8  # In-flight HTTP fetches across all portals
+
+# Links that are never articles: page anchors, auth/nav/legal pages, feeds
+# and static assets. Compiled once; checked before we spend a download on it.
+SKIP_LINK_RE = re.compile(
+    r'^(mailto:|javascript:|tel:|#)'
+    r'|/(login|signin|signup|register|subscribe|account|privacy|terms|contact|about|tags?|category|author)(/|$)'
+    r'|\.(png|jpe?g|gif|svg|webp|ico|css|js|xml|rss|pdf|zip)(\?|$)',
+    re.IGNORECASE
+)
+
+def stable_id(url):
+    """
+    64-bit article ID derived from the URL.
+    abs(hash(url)) is salted per interpreter run (PYTHONHASHSEED), so IDs
+    would change between scrapes and break score lookups in the frontend.
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
 
 class NewsAPIFetcher:
-    def __init__(self):
+    def __init__(self, known_urls=None):
         self.config = self._load_config()
         self.api_key = self.config.get('api_key')
         self.client = NewsApiClient(api_key=self.api_key) if self.api_key else None
         self.publisher = TelegraphPublisher()
+        # URLs already in the news store; anything in here is skipped before
+        # we spend a Telegraph publish on it (merge_news would drop it anyway).
+        self.known_urls = known_urls or set()
 
     def _load_config(self):
         if os.path.exists(NEWSAPI_CONFIG_FILE):
@@ -48,6 +69,7 @@ class NewsAPIFetcher:
 
         print("Fetching NewsAPI headlines...")
         articles = []
+        scraped_at = datetime.now().isoformat()  # One timestamp for the whole batch
         try:
             # Default params if not in config
             category = self.config.get('category', 'technology')
@@ -67,7 +89,10 @@ class NewsAPIFetcher:
                 return []
 
             for item in response.get('articles', []):
-                # Publish content to Telegraph if full content missing? 
+                if item['url'] in self.known_urls:
+                    continue # Already captured on a previous run
+
+                # Publish content to Telegraph if full content missing?
                 # NewsAPI only gives description/content snippet.
                 # Ideally we scrape the 'url' with newspaper3k too?
                 # For hybrid speed, let's just use what we get or do a light wrap.
@@ -87,14 +112,14 @@ class NewsAPIFetcher:
                 )
 
                 articles.append({
-                    "id": abs(hash(item['url'])),
+                    "id": stable_id(item['url']),
                     "source": item.get('source', {}).get('name', 'NewsAPI'),
                     "title": item['title'],
                     "url": item['url'],
                     "telegraph_url": telegraph_url,
                     "image": item.get('urlToImage'),
                     "summary": item.get('description'),
-                    "scraped_at": datetime.now().isoformat(),
+                    "scraped_at": scraped_at,
                     "user_score": None
                 })
                 
@@ -108,6 +133,7 @@ class TelegraphPublisher:
         self.tokens = self._load_or_create_accounts()
         self.current_token_index = 0
         self.telegraph = None
+        self._client_pool = None  # Created lazily inside the running loop
         self._update_client()
 
     def _update_client(self):
@@ -182,223 +208,440 @@ class TelegraphPublisher:
         print("  -> All Telegraph tokens hit rate limits.")
         return None
 
+    async def publish_async(self, title, html_content, author="AI Bot"):
+        if not self.tokens: return None
+
+        # One Telegraph client per token, handed out through a queue: each
+        # publish checks a client out for its duration, so concurrency is
+        # naturally capped at the token count, load spreads across the whole
+        # pool, and there is no shared rotation state to race on. The sync
+        # publish() path (NewsAPI) keeps its own client untouched.
+        if self._client_pool is None:
+            self._client_pool = asyncio.Queue()
+            for token in self.tokens:
+                self._client_pool.put_nowait(Telegraph(access_token=token))
+
+        attempts = 0
+        while attempts < len(self.tokens):
+            client = await self._client_pool.get()
+            try:
+                response = await asyncio.to_thread(
+                    client.create_page,
+                    title=title[:256],
+                    html_content=html_content,
+                    author_name=author
+                )
+                return response['url']
+            except Exception as e:
+                err_str = str(e).lower()
+                if "flood" in err_str:
+                    print(f"  -> Telegraph Flood Control hit. Trying another token...")
+                    attempts += 1
+                else:
+                    print(f"  -> Telegraph publish failed: {e}")
+                    return None
+            finally:
+                # Returned to the back of the queue either way, so a retry
+                # draws a different (FIFO) client than the one that flooded.
+                self._client_pool.put_nowait(client)
+
+        print("  -> All Telegraph tokens hit rate limits.")
+        return None
+
+# Built once at import: the vectorizer is stateless, and constructing it
+# repeatedly re-materializes the English stop-word set and the compiled
+# token pattern for no benefit.
+VECTORIZER = HashingVectorizer(stop_words='english', n_features=2**12, alternate_sign=False)
+
 class NewsML:
     def __init__(self):
+        # HashingVectorizer is stateless (no fitted vocabulary), so the
+        # pickled model is just the regressor weights — smaller on disk
+        # and nothing to re-fit on the text side.
+        # SGDRegressor with L2 penalty is ridge regression fitted
+        # iteratively — same flavour of model, but it supports
+        # partial_fit, so the door is open to incremental updates.
         self.pipeline = make_pipeline(
-            TfidfVectorizer(stop_words='english', max_features=1000),
-            Ridge(alpha=1.0)
+            VECTORIZER,
+            SGDRegressor(penalty='l2', alpha=1e-4, random_state=42)
         )
         self.is_trained = False
+        self.n_samples = 0  # Scored articles seen at last train
+        self.signature = None  # Fingerprint of the scored set at last train
         self.load()
 
     def load(self):
         if os.path.exists(MODEL_FILE):
             try:
-                self.pipeline = joblib.load(MODEL_FILE)
+                saved = joblib.load(MODEL_FILE)
+                if isinstance(saved, dict):
+                    self.pipeline = saved['pipeline']
+                    self.n_samples = saved.get('n_samples', 0)
+                    self.signature = saved.get('signature')
+                else:
+                    self.pipeline = saved  # Legacy format: bare pipeline
                 self.is_trained = True
                 print("ML Model loaded.")
             except Exception as e:
                 print(f"Failed to load model: {e}")
 
     def save(self):
-        joblib.dump(self.pipeline, MODEL_FILE)
+        # LZ4 trades a little ratio for much faster (de)compression than
+        # joblib's default zlib; joblib.load autodetects the codec.
+        joblib.dump({'pipeline': self.pipeline, 'n_samples': self.n_samples,
+                     'signature': self.signature},
+                    MODEL_FILE, compress=('lz4', 1))
         print("ML Model saved.")
 
+    def _scored_signature(self, training_data):
+        # Order-independent blake2b fingerprint of the scored set. Hashing
+        # url:score pairs means an edited score — not just a new one —
+        # changes the signature and triggers a retrain.
+        h = hashlib.blake2b(digest_size=16)
+        for entry in sorted(f"{a['url']}:{a['user_score']}" for a in training_data):
+            h.update(entry.encode('utf-8'))
+        return h.hexdigest()
+
     def train(self, articles):
         """
         Train on articles that have a 'user_score' (1-10).
+        Skips the run entirely unless the scored set changed since the last
+        train (new, removed or edited scores), and updates existing weights
+        with partial_fit (one pass over the scored set) instead of refitting
+        from scratch.
         """
         training_data = [a for a in articles if a.get('user_score') is not None]
-        
+
         if not training_data:
             print("No training data available (no user scores).")
             return
 
-        texts = [f"{a['title']} {a.get('source', '')}" for a in training_data]
-        scores = [float(a['user_score']) for a in training_data]
-
-        if len(texts) < 2:
+        if len(training_data) < 2:
             print("Not enough data to train (need at least 2 scored articles).")
             return
 
-        print(f"Training model on {len(texts)} samples...")
-        self.pipeline.fit(texts, scores)
+        signature = self._scored_signature(training_data)
+        if self.is_trained and signature == self.signature:
+            print(f"Scored set unchanged since last train ({self.n_samples} samples). Skipping.")
+            return
+
+        texts = [f"{a['title']} {a.get('source', '')}" for a in training_data]
+        # One vectorized cast instead of a per-item float() loop; also saves
+        # sklearn converting the list again inside fit().
+        scores = np.asarray([a['user_score'] for a in training_data], dtype=np.float64)
+
+        regressor = self.pipeline[-1]
+        if self.is_trained and hasattr(regressor, 'partial_fit'):
+            print(f"Updating model incrementally on {len(texts)} samples...")
+            regressor.partial_fit(VECTORIZER.transform(texts), scores)
+        else:
+            print(f"Training model on {len(texts)} samples...")
+            self.pipeline.fit(texts, scores)
+
+        self.n_samples = len(training_data)
+        self.signature = signature
         self.is_trained = True
         self.save()
 
     def predict(self, article):
+        return self.predict_many([article])[0]
+
+    def predict_many(self, articles):
+        """
+        Score a batch of articles with a single pipeline call.
+        One predict() per article re-runs the vectorizer (and all the
+        sklearn validation glue) each time; batching amortizes it.
+        """
+        if not articles:
+            return []
         if not self.is_trained:
-            return 5.0  # Default neutral score
-        
-        text = f"{article['title']} {article.get('source', '')}"
+            return [5.0] * len(articles)  # Default neutral score
+
+        texts = [f"{a['title']} {a.get('source', '')}" for a in articles]
         try:
-            prediction = self.pipeline.predict([text])[0]
-            return max(1.0, min(10.0, float(prediction))) # Clamp between 1 and 10
+            predictions = self.pipeline.predict(texts)
+            return [max(1.0, min(10.0, float(p))) for p in predictions] # Clamp between 1 and 10
         except Exception as e:
             print(f"Prediction error: {e}")
-            return 5.0
+            return [5.0] * len(articles)
 
 class PortalManager:
-    def __init__(self):
+    def __init__(self, known_urls=None):
         self.portals = self._load_portals()
         self.publisher = TelegraphPublisher()
 
+        # URLs already in the news store. Skipping them at link-enumeration
+        # time saves the whole fetch/extract/publish path for articles that
+        # merge_news would discard as duplicates anyway — on a steady feed
+        # that's most of the candidates.
+        self.known_urls = known_urls or set()
+
+        # fake_useragent loads its browser database from disk on every
+        # instantiation; one instance serves the whole run.
+        self.ua = UserAgent()
+
+        # ETag / Last-Modified validators from previous runs, keyed by
+        # portal URL, so unchanged index pages cost a 304 instead of a body.
+        self.http_cache = self._load_http_cache()
+
     def _load_portals(self):
         if os.path.exists(PORTALS_FILE):
             with open(PORTALS_FILE, 'r') as f:
-                return json.load(f)
+                portals = json.load(f)
+            # Resolve per-portal derived values once at load time instead of
+            # on every scrape: the link selector and the scheme://host base
+            # used to absolutize relative links. Portals store selectors as
+            # {"item": "h2", "link": "a"} (the shape the frontend writes in
+            # saveNewPortal), combined here into one descendant selector like
+            # "h2 a"; every anchor is the fallback when they're absent.
+            for portal in portals:
+                selectors = portal.get('selectors') or {}
+                item_sel = (selectors.get('item') or '').strip()
+                link_sel = (selectors.get('link') or 'a').strip()
+                portal['item_selector'] = f"{item_sel} {link_sel}" if item_sel else link_sel
+                portal['base'] = '/'.join(portal['url'].split('/')[:3])
+            return portals
         return []
 
-    def scrape_all(self):
+    def _load_http_cache(self):
+        if os.path.exists(HTTP_CACHE_FILE):
+            try:
+                with open(HTTP_CACHE_FILE, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _save_http_cache(self):
+        with open(HTTP_CACHE_FILE, 'w') as f:
+            json.dump(self.http_cache, f, indent=2)
+
+    async def scrape_all(self):
         articles = []
-        for portal in self.portals:
-            if not portal.get('enabled', True):
-                continue
-            
-            print(f"Scraping {portal['url']}...")
-            extracted = self._scrape_portal(portal)
+        enabled = [p for p in self.portals if p.get('enabled', True)]
+
+        # One timestamp for the whole run; per-article now() calls only add
+        # syscall noise and make same-batch articles sort unstably.
+        self._scraped_at = datetime.now().isoformat()
+
+        # One UA string per run as well — ua.random re-rolls on every
+        # access, and a stable header also plays nicer with keep-alive.
+        self._ua_headers = {"User-Agent": self.ua.random}
+
+        # One client shared across all portals/articles; semaphore bounds in-flight fetches
+        # so we don't hammer a single host or our own uplink.
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        # Keep-alive pool sized to the concurrency cap so every in-flight
+        # fetch can reuse a warm connection instead of re-handshaking TLS.
+        limits = httpx.Limits(max_connections=MAX_CONCURRENCY * 2,
+                              max_keepalive_connections=MAX_CONCURRENCY)
+        async with httpx.AsyncClient(follow_redirects=True, timeout=10, limits=limits) as client:
+            results = await asyncio.gather(*[
+                self._scrape_portal_async(portal, client, semaphore) for portal in enabled
+            ])
+
+        self._save_http_cache()
+
+        for extracted in results:
             articles.extend(extracted)
         return articles
 
-    def _scrape_portal(self, portal):
-        # 1. Get Links first using basic requests/bs4 to find article URLs
-        # (Newspaper can do this too, but we want to stick to the 'portal' definition logic loosely)
-        ua = UserAgent()
-        headers = {
-            "User-Agent": ua.random
-        }
-        
+    async def _scrape_portal_async(self, portal, client, semaphore):
+        # 1. Get Links first from the index page to find article URLs
+        headers = dict(self._ua_headers)
+
+        # Conditional fetch: send the validators from last run so an
+        # unchanged index page answers 304 without a body.
+        cached = self.http_cache.get(portal['url'], {})
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
         items = []
+        print(f"Scraping {portal['url']}...")
         try:
-            resp = requests.get(portal['url'], headers=headers, timeout=10)
-            soup = BeautifulSoup(resp.content, 'lxml')
-            
-            # Find links
-            candidates = soup.find_all('a')
+            resp = await client.get(portal['url'], headers=headers)
+
+            if resp.status_code == 304:
+                print(f"  -> {portal['url']} not modified since last run, skipping.")
+                return items
+
+            validators = {}
+            if resp.headers.get('etag'):
+                validators['etag'] = resp.headers['etag']
+            if resp.headers.get('last-modified'):
+                validators['last_modified'] = resp.headers['last-modified']
+            if validators:
+                self.http_cache[portal['url']] = validators
+
+            tree = HTMLParser(resp.content)
+
+            # Find links (selectolax walks the C tree directly, much cheaper than bs4)
+            candidates = tree.css(portal['item_selector'])
             seen_links = set()
-            
-            count = 0
+
+            base = portal['base']  # scheme://host, precomputed at load time
+
+            hrefs = []
             for link in candidates:
-                href = link.get('href')
+                href = link.attributes.get('href')
                 if not href: continue
-                
-                # Normalize URL
-                if not href.startswith('http'):
-                    base = '/'.join(portal['url'].split('/')[:3])
-                    if href.startswith('/'):
+                if SKIP_LINK_RE.search(href): continue
+
+                # Normalize URL — absolute http(s) URLs take the fast path out
+                if not href.startswith(('http://', 'https://')):
+                    if href.startswith('//'):
+                        href = 'https:' + href  # Protocol-relative
+                    elif href.startswith('/'):
                         href = base + href
                     else:
                         href = base + '/' + href
 
                 if href in seen_links: continue
                 seen_links.add(href)
-                
-                # Basic filter: length and keywords? 
+
+                if href in self.known_urls: continue # Already in the store
+
+                # Basic filter: length and keywords?
                 # Newspaper will do better validation, but we don't want to scan every single link (nav, footer)
                 # Heuristic: link text length > 15 chars OR href contains specific path
-                text = link.get_text(strip=True)
+                text = link.text(strip=True)
                 if len(text) < 15 and len(href) < 30: continue
-                
-                # Processing with Newspaper3k
-                try:
-                    print(f"  -> Processing {href}...")
-                    
-                    # Create Config with Random UA
-                    config = Config()
-                    config.browser_user_agent = ua.random
-                    config.request_timeout = 10
-
-                    article = Article(href, config=config)
-                    article.download()
-                    article.parse()
-                    
-                    if not article.title or len(article.text) < 200:
-                        # Skip short/empty content
-                        continue
-                        
-                    # NLP (Optional, can be slow)
-                    # article.nlp() 
-                    
-                    # Prepare content for Telegraph
-                    # Simple formatting from text to HTML paragraphs
-                    # For better HTML preservation, we'd need more complex parsing, 
-                    # but newspaper gives clean updates.
-                    
-                    # Convert text to simple HTML for telegraph
-                    html_body = ""
-                    if article.top_image:
-                        html_body += f"<img src='{article.top_image}'><br>"
-                    
-                    # Paragraphs
-                    paragraphs = article.text.split('\n\n')
-                    for p in paragraphs:
-                        if p.strip():
-                            html_body += f"<p>{p.strip()}</p>"
-                            
-                    # Publish
-                    telegraph_url = self.publisher.publish(
-                        title=article.title,
-                        html_content=html_body,
-                        author=f"{portal.get('section', 'Bot')} - {', '.join(article.authors)}"
-                    )
-                    
-                    items.append({
-                        "id": abs(hash(href)),
-                        "source": portal.get('section', 'General'),
-                        "title": article.title,
-                        "url": href,
-                        "telegraph_url": telegraph_url, # NEW field
-                        "image": article.top_image or "https://placehold.co/600x400?text=News",
-                        "summary": article.meta_description or article.text[:150] + "...",
-                        "scraped_at": datetime.now().isoformat(),
-                        "user_score": None
-                    })
-                    
-                    count += 1
-                    if count >= 3: break # Limit to 3 deep articles per portal for speed/rate-limits
-                    
-                except Exception as e:
-                    print(f"    Failed to process article {href}: {e}")
-                    continue
+
+                hrefs.append(href)
+                if len(hrefs) >= 10: break # Fetch a few spares; we keep the first 3 that parse
+
+            # 2. Fetch & extract the candidates concurrently. Publishing is
+            # deliberately deferred: only the articles we actually keep get
+            # Telegraph pages, so the spare candidates never burn publish
+            # quota or leave orphan pages behind.
+            results = await asyncio.gather(*[
+                self._process_article_async(href, portal, client, semaphore) for href in hrefs
+            ])
+
+            # Limit to 3 deep articles per portal for speed/rate-limits
+            kept = [parsed for parsed in results if parsed is not None][:3]
+
+            items = list(await asyncio.gather(*[
+                self._publish_article_async(parsed, portal) for parsed in kept
+            ]))
 
         except Exception as e:
             print(f"Error scraping portal {portal['url']}: {e}")
-            
+
         return items
 
+    async def _process_article_async(self, href, portal, client, semaphore):
+        async with semaphore:
+            try:
+                print(f"  -> Processing {href}...")
+
+                # Stream the body with a size cap so one huge page (infinite
+                # scroll dumps, PDFs mislabelled as html) can't blow up memory
+                # and parse time.
+                async with client.stream('GET', href, headers=self._ua_headers) as resp:
+                    chunks = []
+                    received = 0
+                    async for chunk in resp.aiter_bytes():
+                        chunks.append(chunk)
+                        received += len(chunk)
+                        if received > MAX_ARTICLE_BYTES:
+                            print(f"    Skipping {href}: page larger than {MAX_ARTICLE_BYTES} bytes")
+                            return None
+                    html = b''.join(chunks).decode(resp.encoding or 'utf-8', errors='replace')
+
+                # trafilatura extracts body + metadata in one lxml pass,
+                # no tokenizer models or per-article setup needed.
+                extracted = trafilatura.extract(html, url=href, output_format='json', with_metadata=True)
+                if not extracted:
+                    return None
+                data = json.loads(extracted)
+
+                title = data.get('title')
+                text = data.get('text') or ''
+                if not title or len(text) < 200:
+                    # Skip short/empty content
+                    return None
+
+                # Parsed payload only — no side effects yet; the caller
+                # decides which of these are kept and published.
+                return {
+                    "url": href,
+                    "title": title,
+                    "text": text,
+                    "image": data.get('image'),
+                    "author": data.get('author') or '',
+                    # trafilatura's JSON names the meta description 'excerpt'
+                    "description": data.get('excerpt'),
+                }
+
+            except Exception as e:
+                print(f"    Failed to process article {href}: {e}")
+                return None
+
+    async def _publish_article_async(self, parsed, portal):
+        # Prepare content for Telegraph
+        # Simple formatting from text to HTML paragraphs
+        html_body = ""
+        if parsed['image']:
+            html_body += f"<img src='{parsed['image']}'><br>"
+
+        # Paragraphs — single join instead of building the string
+        # with repeated += concatenations
+        html_body += ''.join(
+            f"<p>{p.strip()}</p>" for p in parsed['text'].split('\n') if p.strip()
+        )
+
+        telegraph_url = await self.publisher.publish_async(
+            title=parsed['title'],
+            html_content=html_body,
+            author=f"{portal.get('section', 'Bot')} - {parsed['author']}"
+        )
+
+        return {
+            "id": stable_id(parsed['url']),
+            "source": portal.get('section', 'General'),
+            "title": parsed['title'],
+            "url": parsed['url'],
+            "telegraph_url": telegraph_url, # NEW field
+            "image": parsed['image'] or "https://placehold.co/600x400?text=News",
+            "summary": parsed['description'] or parsed['text'][:150] + "...",
+            "scraped_at": self._scraped_at,
+            "user_score": None
+        }
+
 def merge_news(old_news, new_news):
-    # Dedup by URL
-    existing_map = {n['url']: n for n in old_news}
-    
-    merged = []
-    # Keep old news 
+    # O(n) dict-based merge keyed by URL. Old entries win on conflict so
+    # user scores survive a re-scrape, and duplicates anywhere — legacy
+    # store entries or two portals surfacing the same article — collapse.
+    merged = {}
+    old_items = []
     for n in old_news:
-        merged.append(n)
-        
-    count_new = 0
+        if n['url'] not in merged:
+            merged[n['url']] = n
+            old_items.append(n)
+
+    fresh = []
     for n in new_news:
-        if n['url'] not in existing_map:
-            merged.insert(0, n)
-            count_new += 1
-            
-    return merged, count_new
+        if n['url'] not in merged:
+            merged[n['url']] = n
+            fresh.append(n)
+
+    return fresh + old_items, len(fresh)
 
 def cleanup_and_sort_news(news_items, hours=72):
     """
     1. Removes items older than 'hours'
     2. Sorts by scraped_at descending (newest first)
     """
-    cutoff = datetime.now() - timedelta(hours=hours)
-    
-    valid_items = []
-    for item in news_items:
-        try:
-            item_date = datetime.fromisoformat(item['scraped_at'])
-            if item_date > cutoff:
-                valid_items.append(item)
-        except ValueError:
-            valid_items.append(item)
-            
+    # ISO-8601 timestamps from the same clock compare lexicographically,
+    # so one cutoff string computed up front replaces a fromisoformat()
+    # parse per item (the sort below already relies on this property).
+    cutoff_iso = (datetime.now() - timedelta(hours=hours)).isoformat()
+
+    valid_items = [item for item in news_items if item.get('scraped_at', '') > cutoff_iso]
+
     # Sort
     valid_items.sort(key=lambda x: x.get('scraped_at', ''), reverse=True)
     
@@ -1,12 +1,13 @@
-import json
+import asyncio
 import os
+import orjson
 from bot_core import NewsML, PortalManager, NewsAPIFetcher, merge_news, cleanup_and_sort_news, NEWS_FILE
 
 def main():
     # 1. Load Data
     if os.path.exists(NEWS_FILE):
-        with open(NEWS_FILE, 'r') as f:
-            old_news = json.load(f)
+        with open(NEWS_FILE, 'rb') as f:
+            old_news = orjson.loads(f.read())
     else:
         old_news = []
 
@@ -14,18 +15,21 @@ def main():
     ml = NewsML()
     ml.train(old_news)
 
-    # 3. Scrape & Fetch
-    manager = PortalManager()
-    custom_articles = manager.scrape_all()
+    # 3. Scrape & Fetch — hand both fetchers the URLs we already have so
+    # previously captured articles are skipped before fetch/publish.
+    known_urls = {n['url'] for n in old_news}
 
-    api_fetcher = NewsAPIFetcher()
+    manager = PortalManager(known_urls=known_urls)
+    custom_articles = asyncio.run(manager.scrape_all())
+
+    api_fetcher = NewsAPIFetcher(known_urls=known_urls)
     api_articles = api_fetcher.fetch_headlines()
 
     new_articles = custom_articles + api_articles
 
-    # 4. Predict Scores for new articles
-    for article in new_articles:
-        article['predicted_score'] = ml.predict(article)
+    # 4. Predict Scores for new articles (one batched pipeline call)
+    for article, score in zip(new_articles, ml.predict_many(new_articles)):
+        article['predicted_score'] = score
         # Auto-score based on prediction if confidence high? No, user wants supervised.
         # Just store the prediction for sorting/badging.
 
@@ -33,13 +37,21 @@ def main():
     final_news, added_count = merge_news(old_news, new_articles)
     
     # 6. Cleanup & Sort (72h limit, newest first)
+    count_before_cleanup = len(final_news)
     final_news = cleanup_and_sort_news(final_news, hours=72)
+    removed_count = count_before_cleanup - len(final_news)
 
     print(f"Added {added_count} new articles.")
-    
-    # 7. Save
-    with open(NEWS_FILE, 'w') as f:
-        json.dump(final_news, f, indent=2)
+
+    # 7. Save (orjson serializes in one C pass; indent kept for readable diffs)
+    # Only rewrite when the list actually changed — the frontend fetches a
+    # complete JSON array, so append-only output isn't an option, but idle
+    # runs (no new articles, nothing expired) can skip the write entirely.
+    if added_count or removed_count or not os.path.exists(NEWS_FILE):
+        with open(NEWS_FILE, 'wb') as f:
+            f.write(orjson.dumps(final_news, option=orjson.OPT_INDENT_2))
+    else:
+        print("No changes; skipped rewriting news.json.")
 
     print(f"Process Complete. Model trained: {ml.is_trained}. New Articles: {added_count}. Total: {len(final_news)}")
 